@@ -1,31 +1,325 @@
+import os
+
+# Thread pool TF/OpenMP harus diatur sebelum tensorflow di-import
+os.environ.setdefault('TF_NUM_INTRAOP_THREADS', str(os.cpu_count()))
+os.environ.setdefault('TF_NUM_INTEROP_THREADS', '1')
+os.environ.setdefault('OMP_NUM_THREADS', str(os.cpu_count()))
+os.environ.setdefault('KMP_BLOCKTIME', '0')
+os.environ.setdefault('KMP_AFFINITY', 'granularity=fine,compact,1,0')
+
 import streamlit as st
 import numpy as np
-import librosa
+import pandas as pd
+import soundfile as sf
+import scipy.fft
+from scipy.signal import resample_poly
+from scipy.signal.windows import hann
+import mutagen
 import joblib
-from tensorflow.keras.models import load_model
+import hashlib
 import io
+import queue
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import Future
 from audio_recorder_streamlit import audio_recorder
+from audio_kernels import frame_and_window, frame_energy
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
 
 TARGET_SR = 44100
 TARGET_DURATION = 3
 TARGET_LENGTH = TARGET_SR * TARGET_DURATION
 MAX_RECORD_DURATION = 6 
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+N_FRAMES = 1 + TARGET_LENGTH // HOP_LENGTH
+WINDOW = hann(N_FFT, sym=False).astype(np.float32)
+MODEL_OPTIONS = ['model_ser_cnn-91.h5', 'model_ser_6823-68.h5']
+# Model default bisa diganti lewat environment variable SER_MODEL_PATH
+DEFAULT_MODEL_PATH = os.environ.get('SER_MODEL_PATH', 'model_ser_cnn-91.h5')
+MAX_BATCH = 8
+BATCH_TIMEOUT_MS = 20
 
-@st.cache_resource
-def load_assets():
+def load_keras_predictor(model_path):
+    import tensorflow as tf
+    from tensorflow.keras.models import load_model
+
+    configure_tf_threads()
+    model = load_model(model_path)
+
+    # Buffer input di sisi TF dipakai ulang; predict_fn hanya dipanggil dari thread MicroBatcher
+    input_var = tf.Variable(
+        tf.zeros([1, N_MELS, N_FRAMES, 1], tf.float32),
+        shape=tf.TensorShape([None, N_MELS, N_FRAMES, 1]),
+        trainable=False,
+    )
+
+    @tf.function
+    def _predict():
+        return model(input_var, training=False)
+
+    def predict_fn(x):
+        input_var.assign(x)
+        return _predict().numpy()
+
+    return predict_fn
+
+def load_tflite_predictor(model_path):
+    import tensorflow as tf
+
+    interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=os.cpu_count())
+    interpreter.allocate_tensors()
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+    batch_size = 1
+
+    # Interpreter tidak thread-safe; predict_fn hanya dipanggil dari thread MicroBatcher
+    def predict_fn(x):
+        nonlocal batch_size
+        if len(x) != batch_size:
+            interpreter.resize_tensor_input(input_index, x.shape)
+            interpreter.allocate_tensors()
+            batch_size = len(x)
+        interpreter.set_tensor(input_index, x)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index)
+
+    return predict_fn
+
+def load_onnx_predictor(model_path):
+    so = ort.SessionOptions()
+    so.intra_op_num_threads = os.cpu_count()
+    sess = ort.InferenceSession(model_path, sess_options=so, providers=['CPUExecutionProvider'])
+    input_name = sess.get_inputs()[0].name
+
+    def predict_fn(x):
+        return sess.run(None, {input_name: x})[0]
+
+    return predict_fn
+
+_STOP = object()
+
+class MicroBatcher:
+    """Gabungkan request inferensi dari beberapa sesi menjadi satu batch
+
+    Thread worker hanya memegang weakref ke batcher, jadi begitu entry st.cache_resource
+    dibuang, batcher (beserta predict_fn dan bobot model) bisa di-garbage-collect dan
+    finalizer-nya menghentikan worker. close() melakukan hal yang sama secara eksplisit.
+    """
+
+    def __init__(self, predict_fn, max_batch=MAX_BATCH, timeout_ms=BATCH_TIMEOUT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.timeout = timeout_ms / 1000
+        self.queue = queue.Queue()
+        self.buffer = np.empty((max_batch, N_MELS, N_FRAMES, 1), dtype=np.float32)
+        self._finalizer = weakref.finalize(self, self.queue.put, _STOP)
+        self.worker = threading.Thread(
+            target=_batch_worker, args=(weakref.ref(self), self.queue), daemon=True
+        )
+        self.worker.start()
+
+    def __call__(self, x):
+        """x berbentuk (1, N_MELS, N_FRAMES, 1); blok sampai hasil batch tersedia"""
+        if not self._finalizer.alive or not self.worker.is_alive():
+            raise RuntimeError("MicroBatcher sudah ditutup")
+        future = Future()
+        self.queue.put((x, future))
+        return future.result()
+
+    def close(self):
+        """Hentikan worker dan lepaskan referensi ke model"""
+        self._finalizer()
+        self.predict_fn = None
+
+    def _run_batch(self, batch):
+        inputs, futures = zip(*batch)
+        n = len(batch)
+        try:
+            for i, x in enumerate(inputs):
+                self.buffer[i] = x[0]
+            outputs = self.predict_fn(self.buffer[:n])
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for i, future in enumerate(futures):
+            future.set_result(outputs[i:i + 1])
+
+def _fail_pending(batch, requests):
+    """Gagalkan request yang tersisa supaya pemanggil tidak menunggu selamanya"""
+    while True:
+        try:
+            batch.append(requests.get_nowait())
+        except queue.Empty:
+            break
+    error = RuntimeError("MicroBatcher sudah ditutup")
+    for item in batch:
+        if item is not _STOP:
+            item[1].set_exception(error)
+
+def _batch_worker(batcher_ref, requests):
+    # Worker tidak boleh mati diam-diam: apa pun yang terjadi, request yang tersisa digagalkan
     try:
-        model = load_model('model_ser_cnn-91.h5') 
+        stopping = False
+        while not stopping:
+            item = requests.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            batcher = batcher_ref()
+            if batcher is None:
+                _fail_pending(batch, requests)
+                return
+            deadline = time.monotonic() + batcher.timeout
+            while len(batch) < batcher.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                batcher._run_batch(batch)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            # Jangan tahan referensi kuat selama menunggu request berikutnya; future yang gagal
+            # menyimpan traceback yang ikut mereferensikan batcher
+            del batcher, batch, item
+    finally:
+        _fail_pending([], requests)
+
+def configure_tf_threads():
+    import tensorflow as tf
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(os.cpu_count())
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    except RuntimeError:
+        # Runtime TF sudah terinisialisasi, pengaturan dari environment tetap berlaku
+        pass
+
+# Cache dipakai bersama semua sesi: satu entry per model (+1 untuk SER_MODEL_PATH di luar daftar),
+# jadi sesi dengan model berbeda tidak saling membuang entry dan tetap berbagi satu MicroBatcher
+@st.cache_resource(max_entries=len(MODEL_OPTIONS) + 1)
+def load_assets(model_path):
+    """Muat model sekali per path; varian .onnx/.tflite di samping file .h5 dipakai bila ada"""
+    try:
+        base_path, _ = os.path.splitext(model_path)
+        onnx_path, tflite_path = base_path + '.onnx', base_path + '.tflite'
+        if ort is not None and os.path.exists(onnx_path):
+            predict_fn = load_onnx_predictor(onnx_path)
+        elif os.path.exists(tflite_path):
+            predict_fn = load_tflite_predictor(tflite_path)
+        else:
+            predict_fn = load_keras_predictor(model_path)
         data = joblib.load('label_data.joblib') 
         label_encoder = data['label_encoder']
-        return model, label_encoder
+        # Kelas tetap sejak load, jadi prediksi cukup diindeks langsung tanpa inverse_transform
+        classes = np.asarray(label_encoder.classes_)
+        # Pastikan model cocok dengan pipeline fitur dan label_data.joblib sebelum dipakai
+        output = predict_fn(np.zeros((1, N_MELS, N_FRAMES, 1), dtype=np.float32))
+        if output.shape != (1, len(classes)):
+            raise ValueError(
+                f"output model {model_path} berbentuk {output.shape}, "
+                f"sedangkan label_data.joblib berisi {len(classes)} kelas"
+            )
+        return MicroBatcher(predict_fn), classes
     except Exception as e:
         st.error(f"Error saat memuat aset: {e}")
         return None, None
 
-def preprocess_audio_from_bytes(audio_bytes, sr=TARGET_SR):
+def hz_to_mel(freqs):
+    """Skala mel Slaney (linear di bawah 1 kHz, logaritmik di atasnya), seperti librosa"""
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mels = freqs * 3.0 / 200.0
+    log_region = freqs >= 1000.0
+    mels[log_region] = 15.0 + np.log(freqs[log_region] / 1000.0) / (np.log(6.4) / 27.0)
+    return mels
+
+def mel_to_hz(mels):
+    mels = np.asarray(mels, dtype=np.float64)
+    freqs = mels * 200.0 / 3.0
+    log_region = mels >= 15.0
+    freqs[log_region] = 1000.0 * np.exp((np.log(6.4) / 27.0) * (mels[log_region] - 15.0))
+    return freqs
+
+@st.cache_resource
+def load_mel_filterbank():
+    """Filterbank mel setara librosa.filters.mel(sr, n_fft, n_mels) (htk=False, norm='slaney'),
+    dibangun dengan NumPy agar librosa tidak perlu di-import saat startup"""
+    fft_freqs = np.fft.rfftfreq(N_FFT, d=1.0 / TARGET_SR)
+    mel_min, mel_max = hz_to_mel([0.0, TARGET_SR / 2.0])
+    mel_freqs = mel_to_hz(np.linspace(mel_min, mel_max, N_MELS + 2))
+    fdiff = np.diff(mel_freqs)
+    ramps = mel_freqs[:, np.newaxis] - fft_freqs[np.newaxis, :]
+    lower = -ramps[:-2] / fdiff[:-1, np.newaxis]
+    upper = ramps[2:] / fdiff[1:, np.newaxis]
+    weights = np.maximum(0.0, np.minimum(lower, upper))
+    weights *= (2.0 / (mel_freqs[2:] - mel_freqs[:-2]))[:, np.newaxis]
+    return weights.astype(np.float32)
+
+@st.cache_resource
+def warm_up_kernels():
+    """Kompilasi kernel Numba saat load, bukan pada request pertama pengguna"""
+    dummy = np.zeros(N_FFT + HOP_LENGTH, dtype=np.float32)
+    frame_and_window(dummy, WINDOW, HOP_LENGTH, N_FFT)
+    frame_energy(dummy, HOP_LENGTH, N_FFT)
+    return True
+
+def load_audio_from_bytes(audio_bytes, sr=TARGET_SR):
+    """Decode audio bytes menjadi sinyal mono float32 pada sample rate `sr`"""
     try:
-        audio, _ = librosa.load(io.BytesIO(audio_bytes), sr=sr)
-        audio_trimmed, _ = librosa.effects.trim(audio, top_db=20)
+        audio, orig_sr = sf.read(io.BytesIO(audio_bytes), dtype='float32', always_2d=False)
+    except Exception:
+        # Format yang tidak didukung soundfile (mis. MP3 lama) lewat audioread,
+        # yang hanya bisa membuka path file, bukan BytesIO
+        import librosa
+
+        with tempfile.NamedTemporaryFile(delete=False) as tmp:
+            tmp.write(audio_bytes)
+        try:
+            return librosa.load(tmp.name, sr=sr)
+        finally:
+            os.remove(tmp.name)
+
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    if orig_sr != sr:
+        audio = resample_poly(audio, sr, orig_sr).astype(np.float32, copy=False)
+    return audio, sr
+
+def trim_silence(audio, top_db=20):
+    """Potong silence di awal/akhir berdasarkan RMS per frame (setara librosa.effects.trim)"""
+    padded = np.pad(audio, N_FFT // 2, mode='constant')
+    mse = frame_energy(padded, HOP_LENGTH, N_FFT)
+    # rms > max_rms * 10^(-top_db/20)  <=>  mse > max_mse * 10^(-top_db/10)
+    nonsilent = np.flatnonzero(mse > mse.max() * 10.0 ** (-top_db / 10.0))
+    if nonsilent.size == 0:
+        return audio[:0]
+    start = nonsilent[0] * HOP_LENGTH
+    end = min(len(audio), (nonsilent[-1] + 1) * HOP_LENGTH)
+    return audio[start:end]
+
+def preprocess_audio(audio):
+    """Trim silence lalu pad/potong sinyal menjadi TARGET_LENGTH sampel"""
+    try:
+        audio_trimmed = trim_silence(audio, top_db=20)
 
         if len(audio_trimmed) < TARGET_LENGTH:
             padded = np.pad(audio_trimmed, (0, TARGET_LENGTH - len(audio_trimmed)), mode='constant')
@@ -36,67 +330,139 @@ def preprocess_audio_from_bytes(audio_bytes, sr=TARGET_SR):
         st.error(f"Error saat preprocessing audio: {e}")
         return None
 
-def extract_log_mel(audio, sr=TARGET_SR):
+def preprocess_audio_from_bytes(audio_bytes):
+    try:
+        audio, _ = load_audio_from_bytes(audio_bytes, sr=TARGET_SR)
+    except Exception as e:
+        st.error(f"Error saat preprocessing audio: {e}")
+        return None
+    return preprocess_audio(audio)
+
+def extract_log_mel(audio):
+    """Log-mel ternormalisasi dari audio TARGET_SR (MEL_FB dibangun untuk TARGET_SR)"""
     if audio is None: return None
-    mel_spec = librosa.feature.melspectrogram(y=audio, sr=sr, n_fft=2048, hop_length=512, n_mels=128)
-    log_mel = librosa.power_to_db(mel_spec, ref=np.max)
-    mean, std = np.mean(log_mel), np.std(log_mel)
-    return (log_mel - mean) / std if std != 0 else log_mel - mean
+    # STFT center=True seperti librosa: pad N_FFT // 2 di kedua sisi lalu framing
+    padded = np.pad(audio, N_FFT // 2, mode='constant')
+    frames = frame_and_window(padded, WINDOW, HOP_LENGTH, N_FFT)
+    spec = scipy.fft.rfft(frames, axis=1, workers=-1)
+    # |X|^2 langsung dari re^2 + im^2, tanpa sqrt dari np.abs
+    power = np.empty(spec.shape, dtype=np.float32)
+    np.multiply(spec.real, spec.real, out=power)
+    power += spec.imag * spec.imag
+    mel_spec = MEL_FB @ power.T
+    # Setara librosa.power_to_db(ref=np.max, top_db=80), dihitung in-place
+    log_mel = mel_spec
+    np.maximum(log_mel, 1e-10, out=log_mel)
+    np.log10(log_mel, out=log_mel)
+    log_mel *= 10.0
+    log_mel -= log_mel.max()
+    np.maximum(log_mel, -80.0, out=log_mel)
+    mean, std = log_mel.mean(), log_mel.std()
+    log_mel -= mean
+    if std != 0:
+        log_mel /= std
+    return log_mel
 
 def validate_audio_duration(audio_bytes):
-    """Validasi durasi audio maksimal 6 detik"""
+    """Validasi durasi audio maksimal 6 detik (hanya membaca header, tanpa decode)"""
     try:
-        audio, sr = librosa.load(io.BytesIO(audio_bytes))
-        duration = len(audio) / sr
-        return duration <= MAX_RECORD_DURATION, duration
-    except:
-        return False, 0
+        info = sf.info(io.BytesIO(audio_bytes))
+        duration = info.frames / info.samplerate
+    except Exception:
+        # soundfile tidak bisa membaca header MP3 tertentu, pakai mutagen
+        try:
+            duration = mutagen.File(io.BytesIO(audio_bytes)).info.length
+        except:
+            return False, 0
+    return duration <= MAX_RECORD_DURATION, duration
 
 def process_recorded_audio(audio_bytes):
     """Proses audio yang direkam dan potong jika lebih dari 6 detik"""
     try:
-        audio, sr = librosa.load(io.BytesIO(audio_bytes), sr=TARGET_SR)
+        audio, sr = load_audio_from_bytes(audio_bytes)
+        playback_bytes = audio_bytes
         
         max_samples = int(MAX_RECORD_DURATION * sr)
         if len(audio) > max_samples:
             audio = audio[:max_samples]
             st.info(f"⚠️ Audio dipotong menjadi {MAX_RECORD_DURATION} detik")
+            # Encode ulang sekali per rekaman hanya jika dipotong, agar playback sesuai yang dianalisis
+            audio_buffer = io.BytesIO()
+            sf.write(audio_buffer, audio, sr, format='WAV')
+            playback_bytes = audio_buffer.getvalue()
         
-        import soundfile as sf
-        from io import BytesIO
-        
-        audio_buffer = BytesIO()
-        sf.write(audio_buffer, audio, sr, format='WAV')
-        audio_buffer.seek(0)
-        processed_bytes = audio_buffer.getvalue()
-        audio_buffer.close()
-        
-        return processed_bytes, len(audio) / sr
+        return audio, sr, playback_bytes
     except Exception as e:
         st.error(f"Error processing audio: {e}")
-        return None, 0
+        return None, TARGET_SR, None
 
-def analyze_emotion(audio_bytes):
-    """Fungsi untuk menganalisis emosi dari audio bytes"""
-    processed_audio = preprocess_audio_from_bytes(audio_bytes)
+def predict_emotion(processed_audio):
+    """Ekstrak log-mel dari audio yang sudah dipreproses lalu jalankan model"""
     log_mel_spec = extract_log_mel(processed_audio)
     
     if log_mel_spec is not None:
-        log_mel_spec_expanded = log_mel_spec[np.newaxis, ..., np.newaxis]
-        predictions = model.predict(log_mel_spec_expanded)
+        log_mel_spec_expanded = log_mel_spec[np.newaxis, ..., np.newaxis].astype(np.float32, copy=False)
+        predictions = predict_fn(log_mel_spec_expanded)
         predicted_index = np.argmax(predictions, axis=1)[0]
-        predicted_emotion = label_encoder.inverse_transform([predicted_index])[0]
+        predicted_emotion = classes[predicted_index]
         
         return predicted_emotion, predictions[0]
     return None, None
 
+def analyze_emotion_from_array(audio, sr=TARGET_SR):
+    """Fungsi untuk menganalisis emosi dari sinyal audio yang sudah di-decode"""
+    if sr != TARGET_SR:
+        audio = resample_poly(audio, TARGET_SR, sr).astype(np.float32, copy=False)
+    return predict_emotion(preprocess_audio(audio))
+
+def analyze_emotion(audio_bytes):
+    """Fungsi untuk menganalisis emosi dari audio bytes"""
+    return predict_emotion(preprocess_audio_from_bytes(audio_bytes))
+
+def hash_audio(audio_bytes):
+    return hashlib.blake2b(audio_bytes).digest()
+
+# Argumen berawalan '_' tidak di-hash oleh Streamlit; cache dikunci oleh audio_hash dan model_path
+@st.cache_data(max_entries=128, show_spinner=False)
+def cached_analyze_emotion(audio_hash, model_path, _audio_bytes):
+    return analyze_emotion(_audio_bytes)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def cached_analyze_emotion_from_array(audio_hash, model_path, _audio, sr=TARGET_SR):
+    return analyze_emotion_from_array(_audio, sr)
+
+def show_confidence_scores(emotions, predictions):
+    """Tampilkan semua confidence score dalam satu tabel (satu payload, bukan satu progress bar per kelas)"""
+    scores = pd.DataFrame({
+        "Emosi": np.char.capitalize(emotions.astype(str)),
+        "Confidence": predictions.astype(float),
+    })
+    st.dataframe(
+        scores,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Confidence": st.column_config.ProgressColumn(format="%.3f", min_value=0.0, max_value=1.0),
+        },
+    )
+
 st.set_page_config(page_title="Deteksi Emosi Suara", layout="wide")
 st.title("🎤 Demo Deteksi Emosi dari Suara")
 st.write("Rekam suara langsung atau unggah file audio (.wav atau .mp3) untuk mendeteksi emosi.")
 
-model, label_encoder = load_assets()
+model_options = list(MODEL_OPTIONS)
+if DEFAULT_MODEL_PATH not in model_options:
+    model_options.insert(0, DEFAULT_MODEL_PATH)
+model_path = st.sidebar.radio(
+    "Model",
+    model_options,
+    index=model_options.index(DEFAULT_MODEL_PATH),
+)
+predict_fn, classes = load_assets(model_path)
+MEL_FB = load_mel_filterbank()
+warm_up_kernels()
 
-if model and label_encoder:
+if predict_fn is not None and classes is not None:
     tab1, tab2 = st.tabs(["📁 Upload File", "🎙️ Rekam Suara"])
     
     with tab1:
@@ -117,16 +483,14 @@ if model and label_encoder:
                 
                 if st.button("🔍 Deteksi Emosi dari File", key="detect_upload"):
                     with st.spinner("Sedang menganalisis audio..."):
-                        predicted_emotion, predictions = analyze_emotion(audio_bytes)
+                        predicted_emotion, predictions = cached_analyze_emotion(hash_audio(audio_bytes), model_path, audio_bytes)
                         
                         if predicted_emotion is not None:
                             st.success("**Hasil Deteksi Emosi:**")
                             st.metric(label="Emosi", value=predicted_emotion.capitalize())
                             
                             with st.expander("📊 Confidence Scores"):
-                                emotions = label_encoder.classes_
-                                for emotion, score in zip(emotions, predictions):
-                                    st.progress(float(score), text=f"{emotion.capitalize()}: {score:.3f}")
+                                show_confidence_scores(classes, predictions)
                         else:
                             st.error("Gagal mengekstrak fitur dari audio. Coba file lain.")
     
@@ -138,8 +502,14 @@ if model and label_encoder:
             st.session_state.recorded_audio = None
         if 'audio_processed' not in st.session_state:
             st.session_state.audio_processed = None
+        if 'audio_sr' not in st.session_state:
+            st.session_state.audio_sr = TARGET_SR
+        if 'audio_playback' not in st.session_state:
+            st.session_state.audio_playback = None
         if 'audio_duration' not in st.session_state:
             st.session_state.audio_duration = 0
+        if 'audio_hash' not in st.session_state:
+            st.session_state.audio_hash = None
         
         audio_bytes = audio_recorder(
             text="Klik untuk mulai merekam",
@@ -153,28 +523,32 @@ if model and label_encoder:
         
         if audio_bytes and audio_bytes != st.session_state.recorded_audio:
             st.session_state.recorded_audio = audio_bytes
-            processed_bytes, duration = process_recorded_audio(audio_bytes)
-            st.session_state.audio_processed = processed_bytes
-            st.session_state.audio_duration = duration
+            st.session_state.audio_hash = hash_audio(audio_bytes)
+            processed_audio, sr, playback_bytes = process_recorded_audio(audio_bytes)
+            st.session_state.audio_processed = processed_audio
+            st.session_state.audio_sr = sr
+            st.session_state.audio_playback = playback_bytes
+            st.session_state.audio_duration = len(processed_audio) / sr if processed_audio is not None else 0
         
-        if st.session_state.recorded_audio and st.session_state.audio_processed:
+        if st.session_state.recorded_audio and st.session_state.audio_processed is not None:
             st.success("✅ Rekaman berhasil!")
             st.info(f"📊 Durasi rekaman: {st.session_state.audio_duration:.2f} detik")
             
-            st.audio(st.session_state.audio_processed, format='audio/wav')
+            st.audio(st.session_state.audio_playback, format='audio/wav')
             
             if st.button("🔍 Deteksi Emosi", key="detect_record"):
                 with st.spinner("Sedang menganalisis rekaman..."):
-                    predicted_emotion, predictions = analyze_emotion(st.session_state.audio_processed)
+                    predicted_emotion, predictions = cached_analyze_emotion_from_array(
+                        st.session_state.audio_hash, model_path,
+                        st.session_state.audio_processed, st.session_state.audio_sr,
+                    )
                     
                     if predicted_emotion is not None:
                         st.success("**Hasil Deteksi Emosi:**")
                         st.metric(label="Emosi", value=predicted_emotion.capitalize())
                         
                         with st.expander("📊 Confidence Scores"):
-                            emotions = label_encoder.classes_
-                            for emotion, score in zip(emotions, predictions):
-                                st.progress(float(score), text=f"{emotion.capitalize()}: {score:.3f}")
+                            show_confidence_scores(classes, predictions)
                     else:
                         st.error("Gagal mengekstrak fitur dari rekaman.")
         elif st.session_state.recorded_audio is None:
@@ -196,4 +570,4 @@ if model and label_encoder:
         """)
 
 else:
-    st.warning("Aset model tidak dapat dimuat. Pastikan file 'model_ser_cnn-91.h5' dan 'label_data.joblib' ada di folder yang sama.")
+    st.warning(f"Aset model tidak dapat dimuat. Pastikan file '{model_path}' dan 'label_data.joblib' ada di folder yang sama.")
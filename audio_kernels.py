@@ -0,0 +1,46 @@
+"""Kernel framing audio untuk app.py, dikompilasi dengan Numba bila tersedia
+
+Disimpan di modul terpisah karena Streamlit menjalankan ulang app.py pada setiap
+interaksi, sedangkan modul yang di-import hanya dimuat (dan dikompilasi) sekali.
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+def _frame_and_window_numpy(audio, win, hop, n_fft):
+    return np.lib.stride_tricks.sliding_window_view(audio, n_fft)[::hop] * win
+
+def _frame_energy_numpy(audio, hop, n_fft):
+    frames = np.lib.stride_tricks.sliding_window_view(audio, n_fft)[::hop]
+    return np.einsum('ij,ij->i', frames, frames) / n_fft
+
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def frame_and_window(audio, win, hop, n_fft):
+        """Frame sinyal dengan hop `hop` lalu kalikan window; hasil (n_frames, n_fft) float32"""
+        n_frames = 1 + (len(audio) - n_fft) // hop
+        frames = np.empty((n_frames, n_fft), dtype=np.float32)
+        for i in numba.prange(n_frames):
+            start = i * hop
+            for j in range(n_fft):
+                frames[i, j] = audio[start + j] * win[j]
+        return frames
+
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def frame_energy(audio, hop, n_fft):
+        """Mean-square energi per frame (RMS kuadrat)"""
+        n_frames = 1 + (len(audio) - n_fft) // hop
+        mse = np.empty(n_frames, dtype=np.float32)
+        for i in numba.prange(n_frames):
+            start = i * hop
+            acc = 0.0
+            for j in range(n_fft):
+                acc += audio[start + j] * audio[start + j]
+            mse[i] = acc / n_fft
+        return mse
+else:
+    frame_and_window = _frame_and_window_numpy
+    frame_energy = _frame_energy_numpy
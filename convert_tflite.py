@@ -0,0 +1,68 @@
+"""Konversi model Keras (.h5) ke TFLite int8 untuk inferensi CPU di app.py
+
+Contoh:
+    python convert_tflite.py path/ke/folder_audio
+"""
+import argparse
+import glob
+import os
+
+import librosa
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+TARGET_SR = 44100
+TARGET_DURATION = 3
+TARGET_LENGTH = TARGET_SR * TARGET_DURATION
+
+def extract_features(path):
+    """Pipeline fitur inferensi seperti di app.py: trim top_db=20, pad/potong, log-mel ternormalisasi
+
+    Sengaja mengikuti app.py, bukan pipeline training di notebook (yang memakai noisereduce
+    dan trim dengan top_db default 60), karena kalibrasi harus mewakili input saat inferensi.
+    """
+    audio, _ = librosa.load(path, sr=TARGET_SR)
+    audio, _ = librosa.effects.trim(audio, top_db=20)
+    if len(audio) < TARGET_LENGTH:
+        audio = np.pad(audio, (0, TARGET_LENGTH - len(audio)), mode='constant')
+    else:
+        audio = audio[:TARGET_LENGTH]
+    mel_spec = librosa.feature.melspectrogram(y=audio, sr=TARGET_SR, n_fft=2048, hop_length=512, n_mels=128)
+    log_mel = librosa.power_to_db(mel_spec, ref=np.max)
+    mean, std = np.mean(log_mel), np.std(log_mel)
+    log_mel = (log_mel - mean) / std if std != 0 else log_mel - mean
+    return log_mel[np.newaxis, ..., np.newaxis].astype(np.float32)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('audio_dir', help="Folder audio (.wav/.mp3) untuk representative dataset kalibrasi")
+    parser.add_argument('--model', default='model_ser_cnn-91.h5')
+    parser.add_argument('--output', default='model_ser_cnn-91.tflite')
+    parser.add_argument('--num-samples', type=int, default=200)
+    args = parser.parse_args()
+
+    files = sorted(
+        glob.glob(os.path.join(args.audio_dir, '**', '*.wav'), recursive=True)
+        + glob.glob(os.path.join(args.audio_dir, '**', '*.mp3'), recursive=True)
+    )[:args.num_samples]
+    if not files:
+        parser.error(f"Tidak ada file audio di {args.audio_dir}")
+
+    def representative_dataset():
+        for path in files:
+            yield [extract_features(path)]
+
+    model = load_model(args.model)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    tflite_model = converter.convert()
+
+    with open(args.output, 'wb') as f:
+        f.write(tflite_model)
+    print(f"Model TFLite disimpan ke {args.output} ({len(tflite_model) / 1024:.1f} KB)")
+
+if __name__ == '__main__':
+    main()